@@ -8,8 +8,17 @@
 #
 
 import os
-from collections.abc import Iterable as iterable
-from typing import Optional, Tuple, Union, Iterable, overload
+import sys
+
+# typing costs more to import than the rest of this module. Annotations are
+# kept as strings so that it is only loaded by type checkers, or on demand
+# through __getattr__ below for the type aliases (Python 3.7+).
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Optional, Tuple, Union, Iterable, List, overload
+else:
+    def overload(func):
+        return func
 
 __all__ = ["PublicSuffixList"]
 
@@ -20,43 +29,324 @@ PSLURL = "https://publicsuffix.org/list/public_suffix_list.dat"
 
 PSLFILE = os.path.join(os.path.dirname(__file__), "public_suffix_list.dat")
 
-BytesTuple = Tuple[bytes, ...]
-ByteString = Union[bytes, bytearray]
-Domain = Union[str, BytesTuple]
-RelaxDomain = Union[str, BytesTuple, Iterable[ByteString]]
-RelaxFileSource = Union[Iterable[Union[str, ByteString]], str, ByteString]
+# Comment-stripped, gzipped copy of PSLFILE generated by update.compressPSL().
+# The built-in list is loaded from this file while it matches PSLFILE.
+PSLGZFILE = PSLFILE + ".gz"
 
-Labels = Tuple[str, ...]
-AnyStr = Union[str, ByteString]
+# PSLGZFILE is only used while PSLFILE keeps this value.
+_DEFAULTPSLFILE = PSLFILE
 
+SECTION_MARKERS = (
+    "// ===BEGIN ICANN DOMAINS===",
+    "// ===END ICANN DOMAINS===",
+    "// ===BEGIN PRIVATE DOMAINS===",
+    "// ===END PRIVATE DOMAINS===",
+)
 
-def u(s: AnyStr) -> str:
+# Names of the type aliases defined in publicsuffixlist._typing.
+_TYPEALIASES = ("BytesTuple", "ByteString", "Domain", "RelaxDomain",
+                "RelaxFileSource", "Labels", "AnyStr")
+
+if TYPE_CHECKING:
+    from publicsuffixlist._typing import (AnyStr, ByteString, BytesTuple, Domain,
+                                          Labels, RelaxDomain, RelaxFileSource)
+elif sys.version_info < (3, 7):
+    # no module __getattr__; keep the aliases importable at the cost of typing
+    from publicsuffixlist._typing import (AnyStr, ByteString, BytesTuple, Domain,
+                                          Labels, RelaxDomain, RelaxFileSource)
+
+
+def __getattr__(name):
+    """ Import the typing aliases on first access (Python 3.7+). """
+    if name not in _TYPEALIASES:
+        raise AttributeError("module {0!r} has no attribute {1!r}".format(__name__, name))
+
+    from publicsuffixlist import _typing
+    for alias in _TYPEALIASES:
+        globals()[alias] = getattr(_typing, alias)
+    return globals()[name]
+
+
+def u(s: "AnyStr") -> str:
     return s if isinstance(s, str) else s.decode(ENCODING, ERRORMODE)
 
 
-def b(s: AnyStr) -> bytes:
+def b(s: "AnyStr") -> bytes:
     return bytes(s) if isinstance(s, (bytes, bytearray)) else s.encode(ENCODING, ERRORMODE)
 
 
-def encode_idn(domain: AnyStr) -> str:
+def encode_idn(domain: "AnyStr") -> str:
     return u(domain).encode("idna").decode("ascii")
 
 
-def decode_idn(domain: AnyStr) -> str:
+def decode_idn(domain: "AnyStr") -> str:
     return b(domain).decode("idna")
 
 
+def _isascii(s: str) -> bool:
+    try:
+        s.encode("ascii")
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+MAXLABELLEN = 63
+MAXDOMAINLEN = 253
+
+_LDHPATTERNS = None
+
+
+def _ldhpatterns():
+    """ Return compiled patterns for an LDH hostname and label.
+
+    Compiled on first use so that importing this module does not load re.
+    """
+    global _LDHPATTERNS
+    if _LDHPATTERNS is None:
+        import re
+        # explicit ranges; IGNORECASE would also accept e.g. KELVIN SIGN
+        label = r"[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?"
+        _LDHPATTERNS = (re.compile(r"(?:{0}\.)*{0}\Z".format(label)),
+                        re.compile(label + r"\Z"))
+    return _LDHPATTERNS
+
+
+_AUTHORITYPATTERN = None
+
+
+def _urlhost(url: str) -> "Optional[str]":
+    """ Return the host part of an URL, or None for IP addresses.
+
+    The authority is located by a single regex scan, then userinfo and port
+    are cut off by index so that only the host itself is sliced out.
+    URLs without "//" are taken as starting with the authority.
+    """
+    global _AUTHORITYPATTERN
+    if _AUTHORITYPATTERN is None:
+        import re
+        _AUTHORITYPATTERN = re.compile(r"(?:(?:[A-Za-z][A-Za-z0-9+.-]*:)?//)?([^/?#\\]*)")
+
+    m = _AUTHORITYPATTERN.match(url)
+    start, end = m.span(1)
+
+    at = url.rfind("@", start, end)
+    if at >= 0:
+        start = at + 1
+    if url.startswith("[", start):
+        # IPv6 literal
+        return None
+    colon = url.find(":", start, end)
+    if colon >= 0:
+        end = colon
+
+    return _hostname(url[start:end])
+
+
+def _emailhost(addr: str) -> "Optional[str]":
+    """ Return the domain part of an email address, or None for IP addresses. """
+    at = addr.rfind("@")
+    if at < 0 or addr.startswith("[", at + 1):
+        return None
+    return _hostname(addr[at + 1:])
+
+
+def _hostname(host: str) -> "Optional[str]":
+    # As in the WHATWG URL standard, a numeric last label makes an IPv4
+    # address (1.2.3.4, 3232235777, 0x7f.1).
+    last = host[host.rfind(".", 0, len(host) - 1) + 1:].rstrip(".")
+    if _isascii(last) and (last.isdigit() or last[:2].lower() == "0x"):
+        return None
+    return host
+
+
+def _readpackagedata(path: str) -> bytes:
+    """ Read a file shipped in this package.
+
+    Uses the module loader so that the file can be read from a zip archive
+    (zipapp, PEX or zipimport) without extracting it to the file system.
+    """
+    loader = globals().get("__loader__")
+    if loader is not None and hasattr(loader, "get_data"):
+        return loader.get_data(path)
+    with open(path, "rb") as f:
+        return f.read()
+
+
+_GZSTAMPPREFIX = "// source: "
+
+
+def _gzstamp(data: bytes, st: os.stat_result) -> str:
+    """ Return the first line of PSLGZFILE for a PSL file of data and stat st.
+
+    Written by update.compressPSL() to tell which file it was generated from.
+    """
+    import hashlib
+    return "{0}size={1} mtime_ns={2} sha256={3}".format(
+        _GZSTAMPPREFIX, st.st_size, st.st_mtime_ns, hashlib.sha256(data).hexdigest())
+
+
+def _gzstampmatches(stamp: str) -> bool:
+    """ Return True if PSLGZFILE, stamped with stamp, was generated from PSLFILE.
+
+    Size and mtime are compared first; a file with the same size but another
+    mtime, e.g. from a fresh checkout, is hashed.
+    """
+    loader = globals().get("__loader__")
+    if loader is not None:
+        from importlib.machinery import SourceFileLoader, SourcelessFileLoader
+        if not isinstance(loader, (SourceFileLoader, SourcelessFileLoader)):
+            # e.g. a zip archive, which is not edited in place
+            return True
+    if not stamp.startswith(_GZSTAMPPREFIX):
+        return False
+    fields = dict(f.partition("=")[::2] for f in stamp[len(_GZSTAMPPREFIX):].split())
+
+    try:
+        st = os.stat(PSLFILE)
+    except OSError:
+        # the compressed copy is all there is
+        return True
+    if str(st.st_size) != fields.get("size"):
+        return False
+    if str(st.st_mtime_ns) == fields.get("mtime_ns"):
+        return True
+    import hashlib
+    with open(PSLFILE, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest() == fields.get("sha256")
+
+
+def _iterbuiltin(chunksize: int = 65536) -> "Iterable[str]":
+    """ Yield the lines of the built-in PSL.
+
+    The compressed PSLGZFILE is used if PSLFILE has its default value and
+    the stamp on the first line of PSLGZFILE matches PSLFILE. Otherwise,
+    e.g. if PSLFILE was set to another path or replaced without running
+    update.compressPSL(), PSLFILE is read.
+    """
+    if PSLFILE == _DEFAULTPSLFILE:
+        try:
+            data = _readpackagedata(PSLGZFILE)
+        except OSError:
+            pass
+        else:
+            lines = _itergzip(data, chunksize)
+            if _gzstampmatches(next(lines, "")):
+                yield from lines
+                return
+
+    # Decoding the whole file at once is much cheaper than
+    # decoding it line by line in _parse.
+    yield from _readpackagedata(PSLFILE).decode(ENCODING, ERRORMODE).splitlines()
+
+
+def _itergzip(data: bytes, chunksize: int) -> "Iterable[str]":
+    """ Yield the lines of gzipped data, decompressed and decoded chunk by chunk. """
+    import zlib
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)  # gzip header
+
+    rest = b""
+    for pos in range(0, len(data), chunksize):
+        buf = rest + decompressor.decompress(data[pos:pos + chunksize])
+        cut = buf.rfind(b"\n") + 1
+        rest = buf[cut:]
+        # a chunk split at a newline never splits a multibyte character
+        yield from buf[:cut].decode(ENCODING, ERRORMODE).splitlines()
+
+    rest += decompressor.flush()
+    yield from rest.decode(ENCODING, ERRORMODE).splitlines()
+
+
+# Flags of a suffix in the rule index: it is listed as a rule itself, as
+# "*.suffix", or as "!suffix". 0 for a suffix that is only part of longer rules.
+_EXACT = 1
+_WILDCARD = 2
+_EXCEPTION = 4
+
+
+def _indexrule(index: dict, rule: str):
+    """ Add a rule to the suffix index used by _countpublic.
+
+    A rule "!city.kobe.jp", "*.kobe.jp" or "kobe.jp" sets its flag on the
+    suffix "city.kobe.jp" or "kobe.jp", and every shorter suffix of it is
+    added with no flags. A lookup walks the suffixes of a domain from the
+    right, probing once per label, and stops at the first miss as no longer
+    rule can match.
+
+    The key of an exact rule is the rule string of the rule set itself, and
+    the values are small ints, so the index costs little more than the hash
+    table.
+    """
+
+    if rule.startswith("!"):
+        core, flag = rule[1:], _EXCEPTION
+    elif rule.startswith("*."):
+        core, flag = rule[2:], _WILDCARD
+    else:
+        core, flag = rule, _EXACT
+
+    index[core] = index.get(core, 0) | flag
+    parent = core.partition(".")[2]
+    # the parents of a suffix in the index are already there
+    while parent and parent not in index:
+        index[parent] = 0
+        parent = parent.partition(".")[2]
+
+
+def _buildindex(rules) -> dict:
+    """ Return the suffix index of rules, see _indexrule(). """
+    index = {}
+    for rule in rules:
+        _indexrule(index, rule)
+    return index
+
+
+class _LayeredRules(object):
+    """ Rule container of a base rule set with rules added and removed on top.
+
+    The base is referenced, not copied.
+    """
+
+    __slots__ = ("base", "added", "removed")
+
+    def __init__(self, base, added: frozenset, removed: frozenset):
+        self.base = base
+        self.added = added
+        self.removed = removed
+
+    def __contains__(self, rule) -> bool:
+        if rule in self.added:
+            return True
+        return rule not in self.removed and rule in self.base
+
+    def __iter__(self):
+        added = self.added
+        removed = self.removed
+        yield from added
+        for rule in self.base:
+            if rule not in added and rule not in removed:
+                yield rule
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
 class PublicSuffixList(object):
     """ PublicSuffixList parser.
 
     After __init__(), all instance methods become thread-safe.
+    The parsed rules and their suffix index are not modified after
+    construction and lookups keep no per-instance mutable state, so one
+    instance can be shared by any number of threads, including on
+    free-threaded CPython builds.
     Most methods accept str (not bytes) or tuple of bytes.
     """
 
-    def __init__(self, source: Optional[RelaxFileSource] = None,
+    def __init__(self, source: "Optional[RelaxFileSource]" = None,
                  accept_unknown: bool = True,
                  accept_encoded_idn: bool = True,
-                 only_icann: bool = False):
+                 only_icann: bool = False,
+                 strict: bool = False):
         """ Parse PSL source file and Return PSL object
 
         source: file (line iterable) object, or flat str to parse. (Default: built-in PSL file)
@@ -66,20 +356,75 @@ class PublicSuffixList(object):
         only_icann: bool, if True, only ICANN suffixes are honored, not private ones.
             The markers '// ===BEGIN ICANN DOMAINS===' and '// ===END ICANN DOMAINS==='
             are needed for ICANN section detection. (Default: False)
+        strict: bool, if True, domains that are not valid hostnames are treated as
+            invalid format before any rule lookup. Labels must be 1-63 letters,
+            digits or inner hyphens, the whole name at most 253 chars, and non-ASCII
+            labels must be IDNA encodable. See invalid_reason(). (Default: False)
         """
 
         self.accept_unknown = accept_unknown
+        self.strict = strict
 
         if source is None:
-            with open(PSLFILE, "rb") as source:
-                self._parse(source, accept_encoded_idn, only_icann=only_icann)
-        else:
-            self._parse(source, accept_encoded_idn, only_icann=only_icann)
+            source = _iterbuiltin()
+
+        self._parse(source, accept_encoded_idn, only_icann=only_icann)
 
-    def _parse(self, source, accept_encoded_idn, only_icann=False):
-        """ PSL parser core """
+    @classmethod
+    def _fromrules(cls, rules, accept_unknown: bool = True, strict: bool = False,
+                   maxlabel: "Optional[int]" = None):
+        """ Return an instance on already parsed rules, without parsing a source.
+
+        rules: frozenset of rules, or any immutable container of rules that
+            supports `in`. It is used as is, not copied.
+        maxlabel: the largest number of labels in a rule. (Default: computed from rules)
+        """
+
+        self = cls.__new__(cls)
+        self.accept_unknown = accept_unknown
+        self.strict = strict
+        self._publicsuffix = rules
+        # other containers, like overlays or shared memory views, are
+        # probed per candidate rule instead
+        self._index = _buildindex(rules) if isinstance(rules, frozenset) else None
+        if maxlabel is None:
+            maxlabel = max([r.count(".") + 1 for r in rules] or [0])
+        self._maxlabel = maxlabel
+        return self
+
+    def overlay(self,
+                add: "Optional[RelaxFileSource]" = None,
+                remove: "Optional[RelaxFileSource]" = None,
+                accept_encoded_idn: bool = True) -> "PublicSuffixList":
+        """ Return new PSL object with rules added and removed on top of this one.
+
+        add, remove: rules in the PSL format, as accepted by __init__(). Wildcard
+            and exception rules are supported. A rule in both is added.
+        accept_encoded_idn: bool, same as __init__(). (Default: True)
+
+        This object is left unchanged and its rules are not copied, so the cost
+        depends only on the size of add and remove. To change an overlay, call
+        this again on the base object rather than on a previous overlay.
+        """
+
+        added = PublicSuffixList(add or "", accept_encoded_idn=accept_encoded_idn)
+        removed = PublicSuffixList(remove or "", accept_encoded_idn=accept_encoded_idn)
+
+        rules = _LayeredRules(self._publicsuffix, added._publicsuffix,
+                              removed._publicsuffix)
+        return type(self)._fromrules(rules, accept_unknown=self.accept_unknown,
+                                     strict=self.strict,
+                                     maxlabel=max(self._maxlabel, added._maxlabel))
+
+    def _parse(self, source, accept_encoded_idn, only_icann=False, index=True):
+        """ PSL parser core
+
+        index: bool, if False, skip the suffix index when only the rule set is
+            needed. Lookups then probe the rule set per candidate rule.
+        """
 
         publicsuffix = set()
+        suffixindex = {} if index else None
         maxlabel = 0
         section_is_icann = None
 
@@ -91,10 +436,10 @@ class PublicSuffixList(object):
             ln += 1
             if only_icann:
                 ul = u(line).rstrip()
-                if ul == "// ===BEGIN ICANN DOMAINS===":
+                if ul == SECTION_MARKERS[0]:
                     section_is_icann = True
                     continue
-                elif ul == "// ===END ICANN DOMAINS===":
+                elif ul == SECTION_MARKERS[1]:
                     section_is_icann = False
                     continue
                 if not section_is_icann:
@@ -106,14 +451,20 @@ class PublicSuffixList(object):
 
             maxlabel = max(maxlabel, s.count(".") + 1)
             publicsuffix.add(s)
-            if accept_encoded_idn:
+            if index:
+                _indexrule(suffixindex, s)
+            # punycode conversion is the costliest step of parsing and
+            # leaves ASCII-only rules unchanged, so skip it for them.
+            if accept_encoded_idn and not _isascii(s):
                 e = encode_idn(s.lstrip("!"))
                 if s[0] == "!":
-                    publicsuffix.add("!" + e)
-                else:
-                    publicsuffix.add(e)
+                    e = "!" + e
+                publicsuffix.add(e)
+                if index:
+                    _indexrule(suffixindex, e)
 
         self._publicsuffix = frozenset(publicsuffix)
+        self._index = suffixindex
         self._maxlabel = maxlabel
 
     def _joinlabels(self, domain, labels, start, *, keep_case=False):
@@ -129,7 +480,7 @@ class PublicSuffixList(object):
             else:
                 return tuple(x.lower() for x in domain[start:])
 
-    def _preparedomain(self, domain) -> Union[Tuple[str, Labels], Tuple[BytesTuple, Labels]]:
+    def _splitdomain(self, domain) -> "Union[Tuple[str, Labels], Tuple[BytesTuple, Labels]]":
 
         if isinstance(domain, str):
             # From PSL definition,
@@ -142,18 +493,58 @@ class PublicSuffixList(object):
         elif isinstance(domain, (bytes, bytearray)):
             raise TypeError("Only str, Iter[ByteString] are supported.")
 
-        elif isinstance(domain, iterable):
+        elif hasattr(type(domain), "__iter__"):
             domain = tuple(bytes(x) for x in domain)
             labels = tuple(str(x, "ascii", ERRORMODE).lower()
                            for x in domain)
         else:
             raise TypeError("Only str, Iter[ByteString] are supported.")
 
+        return domain, labels
+
+    def _preparedomain(self, domain) -> "Union[Tuple[str, Labels], Tuple[BytesTuple, Labels]]":
+
+        domain, labels = self._splitdomain(domain)
+
         if "" in labels:
             # not a valid domain
             return None, None
+        if self.strict and self._invalidreason(domain, labels) is not None:
+            # rejected before any rule lookup
+            return None, None
         return domain, labels
 
+    def _invalidreason(self, domain, labels) -> "Optional[str]":
+
+        hostname, ldhlabel = _ldhpatterns()
+
+        # Fast path: one regex scan validates every label of an ASCII name.
+        if isinstance(domain, str) and len(domain) <= MAXDOMAINLEN and hostname.match(domain):
+            return None
+
+        if "" in labels:
+            return "empty_label"
+
+        total = len(labels) - 1
+        for label in labels:
+            if not _isascii(label):
+                if not isinstance(domain, str):
+                    # tuple of bytes must be punycoded
+                    return "invalid_label"
+                try:
+                    label = encode_idn(label)
+                except UnicodeError:
+                    return "invalid_idna"
+            if len(label) > MAXLABELLEN:
+                return "label_too_long"
+            if not ldhlabel.match(label):
+                return "invalid_label"
+            total += len(label)
+
+        if total > MAXDOMAINLEN:
+            return "too_long"
+        return None
+
     def _countpublic(self, labels, accept_unknown=None) -> int:
 
         if accept_unknown is None:
@@ -184,6 +575,16 @@ class PublicSuffixList(object):
         # This should be resolved by issue:
         # https://github.com/publicsuffix/list/issues/1989
 
+        index = self._index
+        if index is not None:
+            return self._countindexed(index, labels, accept_unknown)
+
+        # Bind the shared rule set once per call. Under free-threaded
+        # CPython every attribute load touches the refcount of the shared
+        # frozenset, so repeated self._publicsuffix lookups in the loop
+        # below contend across threads.
+        publicsuffix = self._publicsuffix
+
         # We start from longest to shortcircuit
         startfrom = max(0, ll - (self._maxlabel + 1))
 
@@ -195,13 +596,13 @@ class PublicSuffixList(object):
             # this is required to backtrack subdomain wildcard
 
             # exception rule
-            if ("!" + s) in self._publicsuffix:
+            if ("!" + s) in publicsuffix:
                 # exception rule has wildcard sibiling.
                 # and the wildcard has implicit root.
                 return depth - 1
 
             # wildcard match
-            if ("*." + s) in self._publicsuffix:
+            if ("*." + s) in publicsuffix:
                 # if we have subdomain, that must be checked against exception
                 # rule. The backtrack check was performed in the previous loop.
                 if i > 0:
@@ -211,50 +612,82 @@ class PublicSuffixList(object):
                 return depth
 
             # exact match
-            if s in self._publicsuffix:
+            if s in publicsuffix:
                 return depth
 
         if accept_unknown:
             return 1
         return 0
 
+    def _countindexed(self, index, labels, accept_unknown) -> int:
+        """ _countpublic on the suffix index, with one probe per label. """
+
+        # Only the longest matching suffix matters, with the same order of
+        # precedence as above: exception > wildcard > exact.
+        suffix = None
+        depth = 0
+        found = 0
+        flags = 0
+        for label in reversed(labels):
+            suffix = label if suffix is None else label + "." + suffix
+            value = index.get(suffix)
+            if value is None:
+                break
+            depth += 1
+            if value:
+                found = depth
+                flags = value
+
+        if flags & _EXCEPTION:
+            return found - 1
+        if flags & _WILDCARD:
+            if found < len(labels):
+                return found + 1
+            return found
+        if flags:
+            return found
+
+        if accept_unknown:
+            return 1
+        return 0
+
     @overload
     def suffix(self,
                domain: str,
-               accept_unknown: Optional[bool] = None,
+               accept_unknown: "Optional[bool]" = None,
                *,
-               keep_case: bool = False) -> Optional[str]: ...
+               keep_case: bool = False) -> "Optional[str]": ...
     @overload
     def suffix(self,
-               domain: Union[BytesTuple, Iterable[ByteString]],
-               accept_unknown: Optional[bool] = None,
+               domain: "Union[BytesTuple, Iterable[ByteString]]",
+               accept_unknown: "Optional[bool]" = None,
                *,
-               keep_case: bool = False) -> Optional[BytesTuple]: ...
+               keep_case: bool = False) -> "Optional[BytesTuple]": ...
     def suffix(self,
-               domain: RelaxDomain,
-               accept_unknown: Optional[bool] = None,
+               domain: "RelaxDomain",
+               accept_unknown: "Optional[bool]" = None,
                *,
-               keep_case: bool = False) -> Optional[Domain]:
+               keep_case: bool = False) -> "Optional[Domain]":
         """ Alias for privatesuffix """
         return self.privatesuffix(domain, accept_unknown=accept_unknown, keep_case=keep_case)
 
     @overload
     def privatesuffix(self,
                domain: str,
-               accept_unknown: Optional[bool] = None,
+               accept_unknown: "Optional[bool]" = None,
                *,
-               keep_case: bool = False) -> Optional[str]: ...
+               keep_case: bool = False) -> "Optional[str]": ...
     @overload
     def privatesuffix(self,
-               domain: Union[BytesTuple, Iterable[ByteString]],
-               accept_unknown: Optional[bool] = None,
+               domain: "Union[BytesTuple, Iterable[ByteString]]",
+               accept_unknown: "Optional[bool]" = None,
                *,
-               keep_case: bool = False) -> Optional[BytesTuple]: ...
+               keep_case: bool = False) -> "Optional[BytesTuple]": ...
     def privatesuffix(self,
-                      domain: RelaxDomain,
-                      accept_unknown: Optional[bool] = None,
+                      domain: "RelaxDomain",
+                      accept_unknown: "Optional[bool]" = None,
                       *,
-                      keep_case: bool = False) -> Optional[Domain]:
+                      keep_case: bool = False) -> "Optional[Domain]":
         """ Return shortest suffix assigned for an individual.
 
         domain: str or unicode to parse. (Required)
@@ -277,20 +710,20 @@ class PublicSuffixList(object):
     @overload
     def publicsuffix(self,
                domain: str,
-               accept_unknown: Optional[bool] = None,
+               accept_unknown: "Optional[bool]" = None,
                *,
-               keep_case: bool = False) -> Optional[str]: ...
+               keep_case: bool = False) -> "Optional[str]": ...
     @overload
     def publicsuffix(self,
-               domain: Union[BytesTuple, Iterable[ByteString]],
-               accept_unknown: Optional[bool] = None,
+               domain: "Union[BytesTuple, Iterable[ByteString]]",
+               accept_unknown: "Optional[bool]" = None,
                *,
-               keep_case: bool = False) -> Optional[BytesTuple]: ...
+               keep_case: bool = False) -> "Optional[BytesTuple]": ...
     def publicsuffix(self,
-                     domain: RelaxDomain,
-                     accept_unknown: Optional[bool] = None,
+                     domain: "RelaxDomain",
+                     accept_unknown: "Optional[bool]" = None,
                      *,
-                     keep_case: bool = False) -> Optional[Domain]:
+                     keep_case: bool = False) -> "Optional[Domain]":
         """ Return longest publically shared suffix.
 
         domain: str or unicode to parse. (Required)
@@ -310,13 +743,93 @@ class PublicSuffixList(object):
 
         return self._joinlabels(domain, labels, -publen, keep_case=keep_case)
 
-    def is_private(self, domain: RelaxDomain) -> bool:
+    def privatesuffix_from_url(self,
+                               url: str,
+                               accept_unknown: "Optional[bool]" = None,
+                               *,
+                               keep_case: bool = False) -> "Optional[str]":
+        """ Return privatesuffix() of the host in URL.
+
+        Handles userinfo and port. Return None if the host is an IPv4 or
+        IPv6 address. URLs without "//" are taken as "host[:port][/path]".
+        """
+        host = _urlhost(url)
+        if host is None:
+            return None
+        return self.privatesuffix(host, accept_unknown, keep_case=keep_case)
+
+    def privatesuffix_from_urls(self,
+                                urls: "Iterable[str]",
+                                accept_unknown: "Optional[bool]" = None,
+                                *,
+                                keep_case: bool = False) -> "List[Optional[str]]":
+        """ Return a list of privatesuffix_from_url() for urls. """
+        privatesuffix = self.privatesuffix
+        result = []
+        for url in urls:
+            host = _urlhost(url)
+            result.append(None if host is None else
+                          privatesuffix(host, accept_unknown, keep_case=keep_case))
+        return result
+
+    def privatesuffix_from_email(self,
+                                 addr: str,
+                                 accept_unknown: "Optional[bool]" = None,
+                                 *,
+                                 keep_case: bool = False) -> "Optional[str]":
+        """ Return privatesuffix() of the domain part of email address.
+
+        Return None if addr has no "@" or the domain is an IP address.
+        """
+        host = _emailhost(addr)
+        if host is None:
+            return None
+        return self.privatesuffix(host, accept_unknown, keep_case=keep_case)
+
+    def privatesuffix_from_emails(self,
+                                  addrs: "Iterable[str]",
+                                  accept_unknown: "Optional[bool]" = None,
+                                  *,
+                                  keep_case: bool = False) -> "List[Optional[str]]":
+        """ Return a list of privatesuffix_from_email() for addrs. """
+        privatesuffix = self.privatesuffix
+        result = []
+        for addr in addrs:
+            host = _emailhost(addr)
+            result.append(None if host is None else
+                          privatesuffix(host, accept_unknown, keep_case=keep_case))
+        return result
+
+    def invalid_reason(self, domain: "RelaxDomain") -> "Optional[str]":
+        """ Return why domain is not a valid hostname, or None if it is valid.
+
+        Works regardless of the strict option, and tells why strict mode
+        rejects a domain. A trailing dot is accepted.
+        The reason is one of:
+          "empty_label": leading dot, consecutive dots or empty domain
+          "too_long": longer than 253 chars (in punycode)
+          "label_too_long": a label is longer than 63 chars
+          "invalid_label": a label has chars other than letters, digits and
+              hyphens, or starts or ends with a hyphen
+          "invalid_idna": a non-ASCII label cannot be encoded by IDNA,
+              including when its punycode would be too long
+        """
+        domain, labels = self._splitdomain(domain)
+        return self._invalidreason(domain, labels)
+
+    def invalid_reasons(self, domains: "Iterable[RelaxDomain]") -> "List[Optional[str]]":
+        """ Return invalid_reason() of each domain, e.g. to count rejections. """
+        splitdomain = self._splitdomain
+        invalidreason = self._invalidreason
+        return [invalidreason(*splitdomain(d)) for d in domains]
+
+    def is_private(self, domain: "RelaxDomain") -> bool:
         """ Return True if domain is private suffix or sub-domain. """
         domain, labels = self._preparedomain(domain)
         publen = self._countpublic(labels)
         return bool(publen and publen < len(labels))
 
-    def is_public(self, domain: RelaxDomain) -> bool:
+    def is_public(self, domain: "RelaxDomain") -> bool:
         """ Return True if domain is publix suffix. """
         domain, labels = self._preparedomain(domain)
         publen = self._countpublic(labels)
@@ -325,20 +838,20 @@ class PublicSuffixList(object):
     @overload
     def privateparts(self,
                domain: str,
-               accept_unknown: Optional[bool] = None,
+               accept_unknown: "Optional[bool]" = None,
                *,
-               keep_case: bool = False) -> Optional[Tuple[str, ...]]: ...
+               keep_case: bool = False) -> "Optional[Tuple[str, ...]]": ...
     @overload
     def privateparts(self,
-               domain: Union[BytesTuple, Iterable[ByteString]],
-               accept_unknown: Optional[bool] = None,
+               domain: "Union[BytesTuple, Iterable[ByteString]]",
+               accept_unknown: "Optional[bool]" = None,
                *,
-               keep_case: bool = False) -> Optional[Tuple[BytesTuple, ...]]: ...
+               keep_case: bool = False) -> "Optional[Tuple[BytesTuple, ...]]": ...
     def privateparts(self,
-                     domain: RelaxDomain,
+                     domain: "RelaxDomain",
                      *,
-                     accept_unknown: Optional[bool] = None,
-                     keep_case: bool = False) -> Optional[Tuple[Domain, ...]]:
+                     accept_unknown: "Optional[bool]" = None,
+                     keep_case: bool = False) -> "Optional[Tuple[Domain, ...]]":
         """ Return tuple of subdomain labels and the private suffix. """
         domain, labels = self._preparedomain(domain)
         publen = self._countpublic(labels, accept_unknown)
@@ -361,25 +874,31 @@ class PublicSuffixList(object):
     @overload
     def subdomain(self,
                domain: str,
-               accept_unknown: Optional[bool] = None,
+               accept_unknown: "Optional[bool]" = None,
                *,
-               keep_case: bool = False) -> Optional[str]: ...
+               keep_case: bool = False) -> "Optional[str]": ...
     @overload
     def subdomain(self,
-               domain: Union[BytesTuple, Iterable[ByteString]],
-               accept_unknown: Optional[bool] = None,
+               domain: "Union[BytesTuple, Iterable[ByteString]]",
+               accept_unknown: "Optional[bool]" = None,
                *,
-               keep_case: bool = False) -> Optional[BytesTuple]: ...
+               keep_case: bool = False) -> "Optional[BytesTuple]": ...
     def subdomain(self,
-                  domain: RelaxDomain,
+                  domain: "RelaxDomain",
                   depth: int,
                   *,
-                  accept_unknown: Optional[bool] = None,
-                  keep_case: bool = False) -> Optional[Domain]:
+                  accept_unknown: "Optional[bool]" = None,
+                  keep_case: bool = False) -> "Optional[Domain]":
         """ Return so-called subdomain of specified depth in the private suffix. """
         domain, labels = self._preparedomain(domain)
         publen = self._countpublic(labels)
-        if len(labels) < publen + 1 + depth:
+        if not publen or len(labels) < publen + 1 + depth:
             return None
         else:
             return self._joinlabels(domain, labels, -(publen + 1 + depth), keep_case=keep_case)
+
+
+if os.environ.get("PUBLICSUFFIXLIST_PROFILE"):
+    # Profile the whole process, see publicsuffixlist.profiling.
+    from publicsuffixlist.profiling import _enable_from_env
+    _enable_from_env()
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2014 ko-zu <causeless@gmail.com>
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+""" Type aliases of publicsuffixlist.
+
+Kept out of the package module so that importing publicsuffixlist does not
+load typing. They are available as publicsuffixlist.BytesTuple etc.
+"""
+
+from typing import Iterable, Tuple, Union
+
+__all__ = ["BytesTuple", "ByteString", "Domain", "RelaxDomain",
+           "RelaxFileSource", "Labels", "AnyStr"]
+
+BytesTuple = Tuple[bytes, ...]
+ByteString = Union[bytes, bytearray]
+Domain = Union[str, BytesTuple]
+RelaxDomain = Union[str, BytesTuple, Iterable[ByteString]]
+RelaxFileSource = Union[Iterable[Union[str, ByteString]], str, ByteString]
+
+Labels = Tuple[str, ...]
+AnyStr = Union[str, ByteString]
@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2014 ko-zu <causeless@gmail.com>
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+""" Conformance and throughput runner for PublicSuffixList.
+
+$ python -m publicsuffixlist.conformance
+
+Replays the official test vectors (test_psl.txt) and a corpus generated from
+every rule of the list through each lookup backend, checks that all
+backends return identical answers, and reports per-backend throughput.
+"""
+
+import argparse
+import functools
+import os
+import random
+import re
+import sys
+import time
+
+from publicsuffixlist import PublicSuffixList, encode_idn
+
+__all__ = ["TESTFILE", "BACKENDS", "load_test_vectors", "generate_corpus",
+           "reference_privatesuffix", "run", "main"]
+
+TESTFILE = os.path.join(os.path.dirname(__file__), "test_psl.txt")
+
+
+def load_test_vectors(path=TESTFILE):
+    """ Return a list of (domain, expected privatesuffix) from test_psl.txt. """
+
+    regex = re.compile(r"^checkPublicSuffix\(('[^']+'), (null|'[^']+')\);")
+    vectors = []
+    with open(path, "rb") as f:
+        for line in f:
+            m = regex.match(line.decode("utf-8"))
+            if not m:
+                continue
+            arg = m.group(1).strip("'")
+            res = None if m.group(2) == "null" else m.group(2).strip("'")
+            vectors.append((arg, res))
+    return vectors
+
+
+def generate_corpus(psl, maxdepth=3, seed=0):
+    """ Return a list of hostnames exercising every rule of psl.
+
+    Each rule yields the rule itself and hostnames up to maxdepth labels
+    below it. Wildcards also yield their root and a matched label,
+    exceptions yield their parent, and random hostnames get mixed case.
+    IDN rules appear both in Unicode and in punycode, as psl holds both.
+    """
+
+    rnd = random.Random(seed)
+    corpus = []
+    for rule in sorted(psl._publicsuffix):
+        if rule.startswith("!"):
+            base = rule[1:]
+            corpus.append(base.split(".", 1)[1])
+        elif rule.startswith("*."):
+            base = rule[2:]
+            corpus.append(base)
+            base = "w%d.%s" % (rnd.randrange(10), base)
+        else:
+            base = rule
+
+        corpus.append(base)
+        labels = [base]
+        for _ in range(rnd.randint(1, maxdepth)):
+            labels.insert(0, "l%d" % rnd.randrange(100))
+            corpus.append(".".join(labels))
+
+        if rnd.random() < 0.1:
+            corpus.append(".".join(labels).upper())
+    return corpus
+
+
+def reference_privatesuffix(rules, domain, accept_unknown=True):
+    """ Straightforward PSL algorithm, used as the conformance oracle.
+
+    Collects every matching rule and picks the prevailing one, treating the
+    root of a wildcard as an implicit rule as PublicSuffixList does.
+    """
+
+    if domain.endswith("."):
+        domain = domain[:-1]
+    labels = domain.lower().split(".")
+    if "" in labels:
+        return None
+
+    publen = 1 if accept_unknown else 0
+    for depth in range(1, len(labels) + 1):
+        s = ".".join(labels[-depth:])
+        if "!" + s in rules:
+            publen = depth - 1
+            break
+        if s in rules or "*." + s in rules:
+            publen = depth
+        if depth < len(labels) and "*." + s in rules:
+            publen = depth + 1
+
+    if not publen or len(labels) < publen + 1:
+        return None
+    return ".".join(labels[-(publen + 1):])
+
+
+def _backend_str(psl):
+    return psl.privatesuffix
+
+
+def _backend_bytestuple(psl):
+    # Tuple of bytes input must be punycoded, so this backend answers in
+    # punycode.
+    def lookup(domain):
+        try:
+            encoded = encode_idn(domain.rstrip(".")) if domain else domain
+        except UnicodeError:
+            return _UNENCODABLE
+        res = psl.privatesuffix(tuple(x.encode("ascii") for x in encoded.split(".")))
+        return None if res is None else b".".join(res).decode("ascii")
+    return lookup
+
+
+def _backend_reference(psl):
+    rules = psl._publicsuffix
+    return lambda domain: reference_privatesuffix(rules, domain, psl.accept_unknown)
+
+
+def _backend_legacy(psl):
+    # the probe per candidate rule used for containers without a suffix index
+    legacy = PublicSuffixList._fromrules(psl._publicsuffix, accept_unknown=psl.accept_unknown,
+                                         maxlabel=psl._maxlabel)
+    legacy._index = None
+    return legacy.privatesuffix
+
+
+def _backend_lru_cache(psl):
+    return functools.lru_cache(maxsize=65536)(psl.privatesuffix)
+
+
+def _backend_snapshot(psl):
+    from publicsuffixlist.snapshot import PublicSuffixListStore
+    store = PublicSuffixListStore(accept_unknown=psl.accept_unknown)
+    store.add("\n".join(psl._publicsuffix), 0)
+    return store.get().privatesuffix
+
+
+def _backend_overlay(psl):
+    # exercise the layered lookup with an overlay that changes nothing
+    return psl.overlay(remove="not-listed.invalid").privatesuffix
+
+
+def _backend_shared(psl):
+    from publicsuffixlist.shared import attach, publish
+    shm = publish(psl)
+    view = attach(shm.name, accept_unknown=psl.accept_unknown)
+    # the mapping of the view stays valid after the name is removed
+    shm.close()
+    shm.unlink()
+    return view.privatesuffix
+
+
+# Sentinel for inputs a backend cannot represent; excluded from comparison.
+_UNENCODABLE = object()
+
+# name -> (factory taking a PublicSuffixList and returning a lookup callable,
+#          whether the backend answers in punycode)
+BACKENDS = {
+    "str": (_backend_str, False),
+    "bytestuple": (_backend_bytestuple, True),
+    "reference": (_backend_reference, False),
+    "legacy": (_backend_legacy, False),
+    "lru_cache": (_backend_lru_cache, False),
+    "snapshot": (_backend_snapshot, False),
+    "overlay": (_backend_overlay, False),
+}
+
+if sys.version_info >= (3, 8) and os.name == "posix":
+    BACKENDS["shared"] = (_backend_shared, False)
+
+
+def run(psl=None, corpus=None, backends=None, rounds=1):
+    """ Run the conformance check and return a report dict.
+
+    psl: PublicSuffixList to test. (Default: built-in PSL)
+    corpus: list of hostnames. (Default: test vectors + generate_corpus(psl))
+    backends: dict in the form of BACKENDS. (Default: BACKENDS)
+
+    The report has "vectors" (failures against test_psl.txt as
+    (backend, domain, expected, result)), "mismatches" (hostnames where
+    backends disagree, as (domain, {backend: result})), "lookups" and
+    "throughput" ({backend: lookups per second}).
+    """
+
+    if psl is None:
+        psl = PublicSuffixList()
+    if backends is None:
+        backends = BACKENDS
+
+    vectors = load_test_vectors() if corpus is None else []
+    if corpus is None:
+        corpus = [d for d, _ in vectors] + generate_corpus(psl)
+
+    results = {}
+    throughput = {}
+    for name, (factory, punycode) in backends.items():
+        lookup = factory(psl)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            res = [lookup(d) for d in corpus]
+        throughput[name] = rounds * len(corpus) / (time.perf_counter() - start)
+        results[name] = res
+
+    failures = []
+    for i, (domain, expected) in enumerate(vectors):
+        for name, (_, punycode) in backends.items():
+            result = results[name][i]
+            if result is _UNENCODABLE:
+                continue
+            if punycode and expected is not None:
+                expected_cmp = encode_idn(expected)
+            else:
+                expected_cmp = expected
+            if result != expected_cmp:
+                failures.append((name, domain, expected, result))
+
+    mismatches = []
+    for i, domain in enumerate(corpus):
+        answers = {}
+        for name, (_, punycode) in backends.items():
+            result = results[name][i]
+            if result is _UNENCODABLE:
+                continue
+            answers[name] = encode_idn(result) if (result and not punycode) else result
+        if len(set(answers.values())) > 1:
+            mismatches.append((domain, answers))
+
+    return {
+        "vectors": failures,
+        "mismatches": mismatches,
+        "lookups": len(corpus),
+        "throughput": throughput,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=3,
+                        help="rounds over the corpus per backend (default: 3)")
+    args = parser.parse_args(argv)
+
+    report = run(rounds=args.rounds)
+
+    print("{0} hostnames per round".format(report["lookups"]))
+    print("{0:>12} {1:>14}".format("backend", "lookups/s"))
+    for name, rate in report["throughput"].items():
+        print("{0:>12} {1:>14,.0f}".format(name, rate))
+
+    for failure in report["vectors"]:
+        print("test vector failed: backend={0} domain={1!r} expected={2!r} got={3!r}".format(*failure))
+    for domain, answers in report["mismatches"]:
+        print("backends disagree on {0!r}: {1!r}".format(domain, answers))
+
+    if report["vectors"] or report["mismatches"]:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
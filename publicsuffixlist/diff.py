@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2014 ko-zu <causeless@gmail.com>
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+""" Impact analysis of PSL updates on stored domains.
+
+$ python -m publicsuffixlist.diff old.dat new.dat hostnames.txt
+
+Prints hostnames whose privatesuffix differs between two PSL files as
+"hostname<TAB>old<TAB>new" lines, with a summary on stderr. The hostnames
+are streamed, and only those under a TLD whose rules changed are evaluated.
+"""
+
+import argparse
+import sys
+
+from publicsuffixlist import PublicSuffixList
+
+__all__ = ["rulediff", "changedtlds", "impact", "main"]
+
+# Returned by changedtlds() when a rule change can affect every TLD.
+ALL = None
+
+
+def rulediff(old: PublicSuffixList, new: PublicSuffixList):
+    """ Return (added, removed) rule sets from old to new. """
+    # frozenset() of a frozenset is free; overlays and shared views get copied
+    oldrules = frozenset(old._publicsuffix)
+    newrules = frozenset(new._publicsuffix)
+    return newrules - oldrules, oldrules - newrules
+
+
+def _tld(rule):
+    return rule.lstrip("!").rsplit(".", 1)[-1]
+
+
+def changedtlds(added, removed):
+    """ Return the set of TLDs whose rule subtree changed.
+
+    Return ALL (None) if a rule like "*" changed, which affects every TLD.
+    """
+    tlds = set()
+    for rule in added:
+        tlds.add(_tld(rule))
+    for rule in removed:
+        tlds.add(_tld(rule))
+    if "*" in tlds:
+        return ALL
+    return frozenset(tlds)
+
+
+def impact(old: PublicSuffixList, new: PublicSuffixList, hostnames, stats=None):
+    """ Yield (hostname, old privatesuffix, new privatesuffix) that differ.
+
+    hostnames: iterable of str, e.g. a file object. Surrounding whitespace
+        and empty lines are skipped.
+    stats: optional dict, updated with counts of "added" and "removed"
+        rules, "tlds" changed (-1 for all), hostnames "scanned", "evaluated"
+        and "changed".
+
+    Only hostnames under a changed TLD are looked up, in both lists.
+    """
+
+    added, removed = rulediff(old, new)
+    tlds = changedtlds(added, removed)
+
+    if stats is None:
+        stats = {}
+    stats.update(added=len(added), removed=len(removed),
+                 tlds=-1 if tlds is ALL else len(tlds),
+                 scanned=0, evaluated=0, changed=0)
+
+    for hostname in hostnames:
+        hostname = hostname.strip()
+        if not hostname:
+            continue
+        stats["scanned"] += 1
+
+        if tlds is not ALL:
+            tld = hostname[hostname.rfind(".", 0, len(hostname) - 1) + 1:].rstrip(".").lower()
+            if tld not in tlds:
+                continue
+
+        stats["evaluated"] += 1
+        before = old.privatesuffix(hostname)
+        after = new.privatesuffix(hostname)
+        if before != after:
+            stats["changed"] += 1
+            yield hostname, before, after
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("old", help="old PSL file")
+    parser.add_argument("new", help="new PSL file")
+    parser.add_argument("hostnames", nargs="?", default="-",
+                        help="file with one hostname per line (default: stdin)")
+    args = parser.parse_args(argv)
+
+    with open(args.old, "rb") as f:
+        old = PublicSuffixList(f)
+    with open(args.new, "rb") as f:
+        new = PublicSuffixList(f)
+
+    stats = {}
+    if args.hostnames == "-":
+        source = sys.stdin
+    else:
+        source = open(args.hostnames, encoding="utf-8", errors="surrogateescape")
+    try:
+        for hostname, before, after in impact(old, new, source, stats):
+            print("{0}\t{1}\t{2}".format(hostname, before or "", after or ""))
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+    sys.stderr.write(
+        "rules added: {added}, removed: {removed}, TLDs changed: {tlds}\n"
+        "hostnames scanned: {scanned}, evaluated: {evaluated}, changed: {changed}\n"
+        .format(**stats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2014 ko-zu <causeless@gmail.com>
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+""" Streaming enrichment of records with PSL lookups.
+
+    psl = PublicSuffixList()
+    for record in enrich(records, psl, "host"):
+        record["privatesuffix"]  # set by enrich()
+
+    async for record in aenrich(async_records, psl, "host"):
+        ...
+
+Records are taken in micro-batches of up to batch_size. Each hostname is
+matched once for all fields, with duplicates and recently seen hostnames
+answered from a per-stage cache, and the records are yielded in order. At
+most one batch is buffered (two for async sources: one being processed, one
+queued), so a slow consumer slows down reading from the source.
+"""
+
+import asyncio
+import time
+
+__all__ = ["FIELDS", "Enricher", "enrich", "aenrich"]
+
+# Lookups available as fields, by the name of the PublicSuffixList method.
+FIELDS = ("publicsuffix", "privatesuffix", "is_private", "is_public")
+
+
+# Each field derived from the prepared domain and its public suffix length,
+# as the PublicSuffixList method of the same name does.
+def _publicsuffix(psl, domain, labels, publen):
+    if not publen or len(labels) < publen:
+        return None
+    return psl._joinlabels(domain, labels, -publen)
+
+
+def _privatesuffix(psl, domain, labels, publen):
+    if not publen or len(labels) < publen + 1:
+        return None
+    return psl._joinlabels(domain, labels, -(publen + 1))
+
+
+def _is_private(psl, domain, labels, publen):
+    return bool(publen and publen < len(labels))
+
+
+def _is_public(psl, domain, labels, publen):
+    return bool(publen and publen == len(labels))
+
+
+_DERIVE = {
+    "publicsuffix": _publicsuffix,
+    "privatesuffix": _privatesuffix,
+    "is_private": _is_private,
+    "is_public": _is_public,
+}
+
+
+def _itemgetter(key):
+    return lambda record: record.get(key)
+
+
+def _itemsetter(record, name, value):
+    record[name] = value
+
+
+class Enricher(object):
+    """ Lookup stage shared by enrich() and aenrich().
+
+    psl: PublicSuffixList to look up with.
+    field: key of the hostname in dict records, or a callable that returns
+        the hostname of a record. Records whose hostname is None are passed
+        through with None results.
+    fields: names of PublicSuffixList methods to apply. (Default: publicsuffix,
+        privatesuffix, is_private)
+    setter: callable(record, name, value) storing each result.
+        (Default: record[name] = value)
+    cachesize: max number of hostnames kept in the result cache. The cache
+        is cleared when full. 0 disables it. (Default: 65536)
+
+    Each hostname is split and matched against the rules once, and all
+    fields are derived from that single match.
+    """
+
+    def __init__(self, psl, field, fields=("publicsuffix", "privatesuffix", "is_private"),
+                 setter=None, cachesize=65536):
+
+        for name in fields:
+            if name not in FIELDS:
+                raise ValueError("Unknown field: " + repr(name))
+
+        self.psl = psl
+        self.getter = field if callable(field) else _itemgetter(field)
+        self.setter = setter or _itemsetter
+        self.fields = tuple(fields)
+        self.cachesize = cachesize
+        self._derive = tuple(_DERIVE[name] for name in self.fields)
+        self._cache = {}
+        self._nones = (None,) * len(self.fields)
+
+    def _lookup(self, hostname):
+        if hostname is None:
+            return self._nones
+        if not isinstance(hostname, str):
+            # labels as any iterable of bytes; a tuple of bytes is hashable
+            hostname = self.psl._splitdomain(hostname)[0]
+        res = self._cache.get(hostname)
+        if res is None:
+            psl = self.psl
+            domain, labels = psl._preparedomain(hostname)
+            publen = psl._countpublic(labels)
+            res = tuple(derive(psl, domain, labels, publen) for derive in self._derive)
+            if self.cachesize:
+                if len(self._cache) >= self.cachesize:
+                    self._cache.clear()
+                self._cache[hostname] = res
+        return res
+
+    def process(self, batch):
+        """ Enrich a list of records in place and return it. """
+        getter = self.getter
+        setter = self.setter
+        fields = self.fields
+        lookup = self._lookup
+        for record in batch:
+            for name, value in zip(fields, lookup(getter(record))):
+                setter(record, name, value)
+        return batch
+
+
+def enrich(records, psl, field, batch_size=256, **kwargs):
+    """ Yield records from an iterable with PSL lookup results set.
+
+    See Enricher for the other arguments.
+    """
+    stage = Enricher(psl, field, **kwargs)
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield from stage.process(batch)
+            batch = []
+    if batch:
+        yield from stage.process(batch)
+
+
+class _End(object):
+    """ Put in the queue by the reader task after the last record. """
+
+    def __init__(self, error=None):
+        self.error = error
+
+
+class aenrich(object):
+    """ Async iterator of records from an (async) iterable with PSL lookup results set.
+
+    batch_size: max records per batch. (Default: 256)
+    max_delay: seconds to wait for more records before a partial batch is
+        processed, so that a quiet stream does not hold records back.
+        (Default: 0.05)
+    max_time: seconds of lookups after which control goes back to the event
+        loop before the rest of the batch. (Default: 0.005)
+
+    See Enricher for the other arguments. Lookups run in the event loop
+    thread in slices of max_time, which keeps the loop responsive.
+    An async source is read by one task into a queue of batch_size records,
+    which stops reading while the consumer falls behind. Call aclose() to
+    stop it when leaving the iteration early.
+    """
+
+    def __init__(self, records, psl, field, batch_size=256, max_delay=0.05,
+                 max_time=0.005, **kwargs):
+        self._stage = Enricher(psl, field, **kwargs)
+        if hasattr(records, "__aiter__"):
+            self._source = records
+            self._sync = None
+        else:
+            self._source = None
+            self._sync = iter(records)
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.max_time = max_time
+        self._ready = []
+        self._queue = None
+        self._reader = None
+        self._error = None
+        self._done = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._ready:
+            await self._fill()
+        if not self._ready:
+            if self._error is not None:
+                error, self._error = self._error, None
+                raise error
+            raise StopAsyncIteration
+        return self._ready.pop()
+
+    async def _read(self):
+        queue = self._queue
+        try:
+            async for record in self._source:
+                await queue.put(record)
+        except asyncio.CancelledError:
+            # an Exception before Python 3.8; aclose() stops the reader
+            raise
+        except Exception as e:
+            # raised to the consumer after the records read so far
+            await queue.put(_End(e))
+        else:
+            await queue.put(_End())
+
+    def _fillsync(self, batch):
+        for record in self._sync:
+            batch.append(record)
+            if len(batch) >= self.batch_size:
+                return
+        self._done = True
+
+    async def _fillasync(self, batch):
+        if self._reader is None:
+            self._queue = asyncio.Queue(maxsize=self.batch_size)
+            self._reader = asyncio.ensure_future(self._read())
+        queue = self._queue
+
+        while len(batch) < self.batch_size:
+            if not batch:
+                record = await queue.get()
+            elif not queue.empty():
+                record = queue.get_nowait()
+            else:
+                # wait a little for the rest of the batch
+                try:
+                    record = await asyncio.wait_for(queue.get(), self.max_delay)
+                except asyncio.TimeoutError:
+                    return
+            if isinstance(record, _End):
+                self._done = True
+                self._reader = None
+                self._error = record.error
+                return
+            batch.append(record)
+
+    async def _fill(self):
+        batch = []
+        if not self._done:
+            if self._sync is not None:
+                # nothing to wait for in a plain iterable
+                self._fillsync(batch)
+            else:
+                await self._fillasync(batch)
+
+        process = self._stage.process
+        start = time.monotonic()
+        for i in range(0, len(batch), 16):
+            process(batch[i:i + 16])
+            if time.monotonic() - start > self.max_time:
+                await asyncio.sleep(0)
+                start = time.monotonic()
+
+        batch.reverse()
+        self._ready = batch
+
+    async def aclose(self):
+        """ Stop reading from an async source. """
+        reader, self._reader = self._reader, None
+        self._done = True
+        if reader is not None:
+            reader.cancel()
+            try:
+                await reader
+            except asyncio.CancelledError:
+                pass
@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2014 ko-zu <causeless@gmail.com>
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+""" Per-phase wall time and call counts of PSL construction and lookups.
+
+    with Profiler() as prof:
+        psl = PublicSuffixList()
+        psl.privatesuffix("www.example.com")
+    prof.dump_json("psl.json")        # or prof.report()
+    prof.dump_stats("psl.prof")       # pstats.Stats("psl.prof"), snakeviz, ...
+    pstats.Stats(prof).sort_stats("tottime").print_stats()
+
+Or for a whole process, without code changes:
+
+$ PUBLICSUFFIXLIST_PROFILE=psl.json python app.py
+
+The value is the output path, written at exit. Paths ending in ".json" get
+the JSON report, others a pstats dump; "-" prints the JSON report to stderr.
+
+Phases of construction are "parse" (own time: rule handling and section
+detection), "read" (time spent waiting on the source iterator, e.g.
+decompressing the built-in list), "decode" (u()) and "encode_idn".
+Phases of lookups are "prepare" (splitting and normalizing the domain),
+"match" (the rule loop of _countpublic) and "join" (building the result).
+
+Profiling patches these functions for the lifetime of the outermost active
+Profiler, so it slows everything down; compare phases, not absolute times.
+"""
+
+import json
+import marshal
+import os
+import sys
+import threading
+import time
+
+import publicsuffixlist
+from publicsuffixlist import PublicSuffixList
+
+__all__ = ["PHASES", "Profiler", "ENVVAR"]
+
+ENVVAR = "PUBLICSUFFIXLIST_PROFILE"
+
+# phase -> (group, owner of the attribute, attribute name); read has no owner.
+PHASES = {
+    "parse": ("construction", PublicSuffixList, "_parse"),
+    "read": ("construction", None, None),
+    "decode": ("construction", publicsuffixlist, "u"),
+    "encode_idn": ("construction", publicsuffixlist, "encode_idn"),
+    "prepare": ("lookup", PublicSuffixList, "_preparedomain"),
+    "match": ("lookup", PublicSuffixList, "_countpublic"),
+    "join": ("lookup", PublicSuffixList, "_joinlabels"),
+}
+
+_timer = time.perf_counter
+
+# Active profilers; the wrappers report to each of them.
+_active = []
+_installlock = threading.Lock()
+_originals = {}
+_local = threading.local()
+
+
+def _record(phase, elapsed, child):
+    """ Account elapsed time of a finished call of phase to the active profilers. """
+    stack = getattr(_local, "stack", None)
+    caller = None
+    if stack:
+        caller = stack[-1][0]
+        stack[-1][1] += elapsed
+    for prof in list(_active):
+        prof._add(phase, caller, elapsed, elapsed - child)
+
+
+def _timed(phase, func):
+    def wrapper(*args, **kwargs):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        # [phase, time spent in nested phases]
+        frame = [phase, 0.0]
+        stack.append(frame)
+        start = _timer()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = _timer() - start
+            stack.pop()
+            _record(phase, elapsed, frame[1])
+    wrapper.__wrapped__ = func
+    wrapper.__name__ = func.__name__
+    wrapper.__doc__ = func.__doc__
+    return wrapper
+
+
+class _TimedSource(object):
+    """ Iterator over a PSL source that accounts each next() as "read". """
+
+    def __init__(self, source):
+        self._it = iter(source)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        start = _timer()
+        try:
+            return next(self._it)
+        finally:
+            _record("read", _timer() - start, 0.0)
+
+
+def _timed_parse(func):
+    def _parse(self, source, *args, **kwargs):
+        if not isinstance(source, (str, bytes, bytearray)):
+            source = _TimedSource(source)
+        return func(self, source, *args, **kwargs)
+    return _timed("parse", _parse)
+
+
+def _install():
+    for phase, (_, owner, name) in PHASES.items():
+        if owner is None:
+            continue
+        func = owner.__dict__[name]
+        _originals[phase] = func
+        if phase == "parse":
+            setattr(owner, name, _timed_parse(func))
+        else:
+            setattr(owner, name, _timed(phase, func))
+
+
+def _uninstall():
+    for phase, func in _originals.items():
+        _, owner, name = PHASES[phase]
+        setattr(owner, name, func)
+    _originals.clear()
+
+
+class Profiler(object):
+    """ Accumulates per-phase time of PSL construction and lookups.
+
+    Use as a context manager, or call start() and stop(). Calls from every
+    thread are accounted while the profiler is active. Profilers can be
+    nested; each one sees the calls made while it is active.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # phase -> [calls, own time, total time, {caller phase: calls}]
+        self._data = {}
+        self._running = False
+
+    def _add(self, phase, caller, elapsed, own):
+        with self._lock:
+            entry = self._data.get(phase)
+            if entry is None:
+                entry = self._data[phase] = [0, 0.0, 0.0, {}]
+            entry[0] += 1
+            entry[1] += own
+            entry[2] += elapsed
+            entry[3][caller] = entry[3].get(caller, 0) + 1
+
+    def start(self):
+        """ Start accounting. Patches the phase functions if not done yet. """
+        with _installlock:
+            if self._running:
+                return
+            if not _active:
+                _install()
+            _active.append(self)
+            self._running = True
+
+    def stop(self):
+        """ Stop accounting. The last active profiler restores the phase functions. """
+        with _installlock:
+            if not self._running:
+                return
+            _active.remove(self)
+            if not _active:
+                _uninstall()
+            self._running = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def report(self) -> dict:
+        """ Return {group: {phase: {"calls", "time", "own_time"}}} in seconds.
+
+        "time" includes nested phases, e.g. "read" and "decode" within "parse",
+        "own_time" does not.
+        """
+
+        res = {}
+        with self._lock:
+            for phase, (calls, own, total, _) in sorted(self._data.items()):
+                group = PHASES[phase][0]
+                res.setdefault(group, {})[phase] = {
+                    "calls": calls, "time": total, "own_time": own}
+        return res
+
+    def dump_json(self, file):
+        """ Write report() as JSON to a path or a text file object. """
+        if hasattr(file, "write"):
+            json.dump(self.report(), file, indent=2, sort_keys=True)
+            file.write("\n")
+        else:
+            with open(file, "w") as f:
+                self.dump_json(f)
+
+    def create_stats(self):
+        """ Fill .stats in the format of cProfile, so that pstats.Stats(self) works. """
+
+        def key(phase):
+            _, owner, name = PHASES[phase]
+            if owner is None:
+                return ("~", 0, "<psl {0}>".format(phase))
+            code = _originals.get(phase, owner.__dict__[name]).__code__
+            return (code.co_filename, code.co_firstlineno,
+                    "{0} [{1}]".format(name, phase))
+
+        stats = {}
+        with self._lock:
+            data = dict((p, (e[0], e[1], e[2], dict(e[3]))) for p, e in self._data.items())
+        for phase, (calls, own, total, callers) in data.items():
+            callerstats = {}
+            for caller, n in callers.items():
+                if caller is not None:
+                    # per-caller times are not tracked; share them by calls
+                    share = float(n) / calls
+                    callerstats[key(caller)] = (n, n, own * share, total * share)
+            stats[key(phase)] = (calls, calls, own, total, callerstats)
+        self.stats = stats
+
+    def dump_stats(self, path: str):
+        """ Write a pstats-compatible dump, like cProfile.Profile.dump_stats(). """
+        self.create_stats()
+        with open(path, "wb") as f:
+            marshal.dump(self.stats, f)
+
+    def dump(self, dest: str):
+        """ Write JSON report to dest ending in ".json", "-" for stderr,
+        or pstats dump to other paths. """
+        if dest == "-":
+            self.dump_json(sys.stderr)
+        elif dest.endswith(".json"):
+            self.dump_json(dest)
+        else:
+            self.dump_stats(dest)
+
+
+def _enable_from_env():
+    dest = os.environ.get(ENVVAR)
+    if not dest:
+        return None
+
+    import atexit
+    prof = Profiler()
+    prof.start()
+    atexit.register(prof.dump, dest)
+    return prof
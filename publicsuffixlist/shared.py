@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2014 ko-zu <causeless@gmail.com>
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+""" PSL rule table in shared memory for prefork servers.
+
+The master process publishes the rules once, and every worker attaches a
+read-only PublicSuffixList view:
+
+    # master
+    shm = publish(PublicSuffixList())
+    # worker
+    psl = attach(shm.name)
+
+The view holds no per-rule Python objects. Rules are looked up in an open
+addressing hash table inside the segment, so the pages stay shared between
+workers and are never touched by refcounting or the garbage collector.
+A lookup probes the table in Python, so it is slower than the frozenset of
+a normal instance; the trade is per-worker memory for lookup speed.
+After every rule was hit, a worker holds about 0.4 MB of private memory for
+an attached view, and about 0.1 MB for a parsed instance inherited from the
+master, whose lookups only read its suffix index; see
+`python -m publicsuffixlist.benchmark --workers N`.
+
+Requires Python 3.8+ (multiprocessing.shared_memory). Before Python 3.13,
+a worker started with the "spawn" method has its own resource tracker,
+which unlinks the segment when the worker exits; use fork-based workers.
+"""
+
+import struct
+import zlib
+from multiprocessing import shared_memory
+
+from publicsuffixlist import ENCODING, ERRORMODE, PublicSuffixList
+
+__all__ = ["SharedRules", "publish", "attach"]
+
+# magic, number of slots, maxlabel, blob offset, blob length
+_HEADER = struct.Struct("<8sIIII")
+_MAGIC = b"PSLSHM1\0"
+
+
+def _hash(data):
+    # crc32 is stable across processes, unlike hash() with PYTHONHASHSEED
+    return zlib.crc32(data)
+
+
+def publish(psl: PublicSuffixList, name=None) -> shared_memory.SharedMemory:
+    """ Copy the rules of psl into a new shared memory segment.
+
+    name: segment name. (Default: a random name)
+
+    Return the SharedMemory. Its .name is passed to attach(). The caller owns
+    the segment and must close() and unlink() it when done.
+    """
+
+    rules = sorted(r.encode(ENCODING, ERRORMODE) for r in psl._publicsuffix)
+
+    nslots = 8
+    while nslots < len(rules) * 2:
+        nslots *= 2
+    mask = nslots - 1
+
+    # two native uint32 per slot: offset and length of the rule in the blob
+    slots = [0] * (nslots * 2)
+    blob = bytearray()
+    for data in rules:
+        i = _hash(data) & mask
+        while slots[i * 2 + 1]:
+            i = (i + 1) & mask
+        slots[i * 2] = len(blob)
+        slots[i * 2 + 1] = len(data)
+        blob += data
+
+    table = struct.pack("{0}I".format(len(slots)), *slots)
+    bloboffset = _HEADER.size + len(table)
+
+    shm = shared_memory.SharedMemory(name=name, create=True,
+                                     size=bloboffset + len(blob))
+    shm.buf[:_HEADER.size] = _HEADER.pack(_MAGIC, nslots, psl._maxlabel,
+                                          bloboffset, len(blob))
+    shm.buf[_HEADER.size:bloboffset] = table
+    shm.buf[bloboffset:bloboffset + len(blob)] = blob
+    return shm
+
+
+def _open(name):
+    try:
+        # Python 3.13+: the segment is owned by the master, keep it out of
+        # the resource tracker of this process.
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Older versions always register it. Forked workers share the
+        # tracker of the master, where registering again is a no-op.
+        return shared_memory.SharedMemory(name=name)
+
+
+class SharedRules(object):
+    """ Read-only rule set backed by a segment written by publish().
+
+    Supports `in`, len() and iteration like the frozenset of PublicSuffixList.
+    """
+
+    def __init__(self, name: str):
+        self._shm = _open(name)
+        buf = self._shm.buf
+        magic, nslots, self.maxlabel, bloboffset, bloblen = _HEADER.unpack_from(buf)
+        if magic != _MAGIC:
+            self._shm.close()
+            raise ValueError("Not a PSL shared memory segment: " + repr(name))
+
+        self._mask = nslots - 1
+        self._slots = buf[_HEADER.size:bloboffset].cast("I")
+        self._blob = buf[bloboffset:bloboffset + bloblen]
+
+    def __contains__(self, rule) -> bool:
+        data = rule.encode(ENCODING, ERRORMODE)
+        slots = self._slots
+        blob = self._blob
+        mask = self._mask
+
+        i = _hash(data) & mask
+        while True:
+            length = slots[i * 2 + 1]
+            if not length:
+                return False
+            if length == len(data):
+                offset = slots[i * 2]
+                if blob[offset:offset + length] == data:
+                    return True
+            i = (i + 1) & mask
+
+    def __iter__(self):
+        slots = self._slots
+        for i in range(0, len(slots), 2):
+            if slots[i + 1]:
+                yield bytes(self._blob[slots[i]:slots[i] + slots[i + 1]]).decode(ENCODING, ERRORMODE)
+
+    def __len__(self) -> int:
+        slots = self._slots
+        return sum(1 for i in range(1, len(slots), 2) if slots[i])
+
+    def close(self):
+        """ Detach from the segment. Views using this object stop working. """
+        self._slots.release()
+        self._blob.release()
+        self._shm.close()
+
+    def __del__(self):
+        # SharedMemory cannot unmap while our memoryviews exist, so release
+        # them before the SharedMemory object gets finalized.
+        shm = getattr(self, "_shm", None)
+        if shm is not None and shm.buf is not None:
+            self.close()
+
+
+def attach(name: str, accept_unknown: bool = True, strict: bool = False) -> PublicSuffixList:
+    """ Return a read-only PublicSuffixList on a segment written by publish().
+
+    accept_unknown, strict: same as PublicSuffixList.
+    The rules are available as ._publicsuffix, a SharedRules object.
+    """
+    rules = SharedRules(name)
+    return PublicSuffixList._fromrules(rules, accept_unknown=accept_unknown,
+                                       strict=strict, maxlabel=rules.maxlabel)
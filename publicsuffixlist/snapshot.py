@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2014 ko-zu <causeless@gmail.com>
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+""" Versioned store of many PSL snapshots for historical lookups. """
+
+import bisect
+import os
+import threading
+from collections import OrderedDict
+
+from publicsuffixlist import PublicSuffixList
+
+__all__ = ["PublicSuffixListStore"]
+
+# End of the validity interval of a rule in the latest version.
+_OPEN = -1
+
+
+def _totimestamp(t):
+    """ Accept POSIX timestamp or datetime. """
+    return t.timestamp() if hasattr(t, "timestamp") else t
+
+
+def _isvalid(intervals, index):
+    for i in range(0, len(intervals), 2):
+        if intervals[i] <= index and (intervals[i + 1] == _OPEN or index < intervals[i + 1]):
+            return True
+    return False
+
+
+class PublicSuffixListStore(object):
+    """ Many PSL versions kept in one deduplicated structure.
+
+    Each distinct rule is stored once with the list of version intervals in
+    which it is valid, so memory grows with the number of rule changes, not
+    with versions x list size. Versions must be added in time order.
+
+    A lookup for a version returns an ordinary PublicSuffixList built on the
+    rule set of that version. The cachesize most recently used instances
+    are cached, evicting the least recently used one, so bulk lookups for
+    one version run at single instance speed.
+    After adding versions, all methods are thread-safe.
+    """
+
+    def __init__(self, accept_unknown: bool = True,
+                 accept_encoded_idn: bool = True,
+                 only_icann: bool = False,
+                 cachesize: int = 4):
+        """ Return an empty store.
+
+        accept_unknown, accept_encoded_idn, only_icann: same as PublicSuffixList.
+        cachesize: int, number of per-version instances to keep. (Default: 4)
+        """
+
+        self.accept_unknown = accept_unknown
+        self.accept_encoded_idn = accept_encoded_idn
+        self.only_icann = only_icann
+        self.cachesize = cachesize
+
+        self._versions = []
+        self._indexes = {}
+        self._timestamps = []
+        # rule -> [start0, end0, start1, end1, ...] version indexes,
+        # each interval is [start, end), end is _OPEN for the latest version
+        self._intervals = {}
+        self._latest = frozenset()
+        # version -> PublicSuffixList, least recently used first
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._versions)
+
+    @property
+    def versions(self) -> list:
+        """ Version ids in time order. """
+        return list(self._versions)
+
+    def add(self, source, timestamp, version=None):
+        """ Add a PSL version valid from timestamp.
+
+        source: anything PublicSuffixList() accepts as source.
+        timestamp: POSIX timestamp or datetime. Must not precede the last version.
+        version: hashable version id. (Default: the index of this version)
+        """
+
+        timestamp = _totimestamp(timestamp)
+        if self._timestamps and timestamp < self._timestamps[-1]:
+            raise ValueError("Versions must be added in time order.")
+        if version is None:
+            version = len(self._versions)
+        if version in self._indexes:
+            raise ValueError("Duplicate version id: " + repr(version))
+
+        # only the rule set is kept, so skip the lookup index
+        parsed = PublicSuffixList.__new__(PublicSuffixList)
+        parsed._parse(source, self.accept_encoded_idn, only_icann=self.only_icann,
+                      index=False)
+        rules = parsed._publicsuffix
+
+        with self._lock:
+            index = len(self._versions)
+            for rule in rules - self._latest:
+                self._intervals.setdefault(rule, []).extend((index, _OPEN))
+            for rule in self._latest - rules:
+                self._intervals[rule][-1] = index
+
+            # share the stored rule objects instead of the new parse
+            intervals = self._intervals
+            self._latest = frozenset(r for r in intervals if intervals[r][-1] == _OPEN)
+            self._indexes[version] = index
+            self._versions.append(version)
+            self._timestamps.append(timestamp)
+
+        return version
+
+    def add_file(self, path: str, timestamp=None, version=None):
+        """ Add a PSL file, e.g. one downloaded by update.updatePSL().
+
+        timestamp: (Default: mtime of the file, which updatePSL() sets to
+            the Last-Modified time of the list)
+        version: (Default: the index of this version)
+        """
+        if timestamp is None:
+            timestamp = os.path.getmtime(path)
+        with open(path, "rb") as f:
+            return self.add(f, timestamp, version)
+
+    def version_at(self, timestamp):
+        """ Return the id of the version in effect at timestamp. """
+        pos = bisect.bisect_right(self._timestamps, _totimestamp(timestamp))
+        if pos == 0:
+            raise LookupError("No version at " + repr(timestamp))
+        return self._versions[pos - 1]
+
+    def rules(self, version=None, timestamp=None) -> frozenset:
+        """ Return the rule set of a version. (Default: the latest version) """
+        return self.get(version, timestamp)._publicsuffix
+
+    def get(self, version=None, timestamp=None) -> PublicSuffixList:
+        """ Return PublicSuffixList of a version given by id or timestamp.
+
+        Default is the latest version.
+        """
+
+        if timestamp is not None:
+            version = self.version_at(timestamp)
+        elif version is None:
+            if not self._versions:
+                raise LookupError("No version")
+            version = self._versions[-1]
+
+        with self._lock:
+            psl = self._cache.get(version)
+            if psl is not None:
+                self._cache.move_to_end(version)
+                return psl
+
+        index = self._indexes.get(version)
+        if index is None:
+            raise LookupError("Unknown version: " + repr(version))
+
+        rules = frozenset(rule for rule, iv in self._intervals.items()
+                          if _isvalid(iv, index))
+        psl = PublicSuffixList._fromrules(rules, accept_unknown=self.accept_unknown)
+
+        with self._lock:
+            if self.cachesize > 0:
+                self._cache[version] = psl
+                self._cache.move_to_end(version)
+                while len(self._cache) > self.cachesize:
+                    self._cache.popitem(last=False)
+        return psl
+
+    def privatesuffix(self, domain, version=None, timestamp=None, **kwargs):
+        """ Return privatesuffix() of domain in a version given by id or timestamp. """
+        return self.get(version, timestamp).privatesuffix(domain, **kwargs)
+
+    def publicsuffix(self, domain, version=None, timestamp=None, **kwargs):
+        """ Return publicsuffix() of domain in a version given by id or timestamp. """
+        return self.get(version, timestamp).publicsuffix(domain, **kwargs)
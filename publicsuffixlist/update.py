@@ -7,11 +7,13 @@
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 #
 import calendar
+import gzip
+import io
 import os
 import time
 from email.utils import parsedate
 
-from publicsuffixlist import PSLFILE, PSLURL, PublicSuffixList
+from publicsuffixlist import PSLFILE, PSLURL, SECTION_MARKERS, PublicSuffixList, _gzstamp, u
 
 try:
     import requests
@@ -19,6 +21,52 @@ except ImportError:
     requests = None
 
 
+def compressPSL(psl_file=PSLFILE, gz_file=None):
+    """ Write a comment-stripped, gzipped copy of a PSL file
+
+    Only the leading license notice, the section markers and the rules are
+    kept, after a first line stamped with the size, mtime and SHA-256 of
+    psl_file. The built-in list is only loaded from the copy while the stamp
+    matches PSLFILE. The output is reproducible for the same input.
+
+    :param psl_file: path for the PSL file to read. Default: PSLFILE
+    :param gz_file: path for the compressed file. Default: psl_file + ".gz"
+    """
+    if gz_file is None:
+        gz_file = psl_file + ".gz"
+
+    with open(psl_file, "rb") as f:
+        data = f.read()
+        lines = [_gzstamp(data, os.fstat(f.fileno()))]
+
+    header = True
+    for line in data.splitlines():
+        ul = u(line).rstrip()
+        if header:
+            if ul.startswith("//"):
+                lines.append(ul)
+                continue
+            header = False
+
+        if ul in SECTION_MARKERS:
+            lines.append(ul)
+            continue
+
+        s = ul.split(" ")[0]
+        if s == "" or s.startswith("//"):
+            continue
+        lines.append(s)
+
+    buf = io.BytesIO()
+    # fixed mtime and no file name for a byte-identical output
+    with gzip.GzipFile(filename="", mode="wb", fileobj=buf, mtime=0) as g:
+        g.write(("\n".join(lines) + "\n").encode("utf8"))
+
+    with open(gz_file + ".swp", "wb") as f:
+        f.write(buf.getvalue())
+    os.replace(gz_file + ".swp", gz_file)
+
+
 def updatePSL(psl_file=PSLFILE):
     """ Updates a local copy of PSL file
 
@@ -51,6 +99,9 @@ def updatePSL(psl_file=PSLFILE):
         t = calendar.timegm(parsedate(lastmod))
         os.utime(psl_file, (t, t))
 
+    # after utime, as the stamp records the mtime
+    compressPSL(psl_file)
+
     print("PSL updated")
     if lastmod:
         print("last-modified: " + lastmod)
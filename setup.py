@@ -19,6 +19,7 @@ setup(name="publicsuffixlist",
       package_data={
           "publicsuffixlist": [
               "public_suffix_list.dat",
+              "public_suffix_list.dat.gz",
               "test_psl.txt",
           ]},
       author="ko-zu",